@@ -88,15 +88,19 @@ class MicrowaveAgilent(Base, MicrowaveInterface):
         """
         # turn of sweeping (both "list" or ”sweep“）
         self._usb_connection.write(':SWEep:RF:STATe OFF')
+        delay = 0.001
         while int(float(self._usb_connection.query(':SWEep:RF:STATe?'))) != 0:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
         # check if running
         mode, is_running = self.get_status()
         if not is_running:
             return 0
         self._usb_connection.write(':RFO:STAT OFF')
+        delay = 0.001
         while int(float(self._usb_connection.query(':RFO:STAT?'))) != 0:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
         #self._mode ="cw"
         return 0
 
@@ -171,8 +175,10 @@ class MicrowaveAgilent(Base, MicrowaveInterface):
                 self.off()
 
         self._usb_connection.write(':RFO:STAT ON')
+        delay = 0.001
         while not is_running:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
             dummy, is_running = self.get_status()
 
         return 0
@@ -219,12 +225,16 @@ class MicrowaveAgilent(Base, MicrowaveInterface):
         try:
             self._usb_connection.write(":SWEep:TYPE LIST")
             self._usb_connection.write(':SWE:RF:STAT ON')
+            delay = 0.001
             while int(float(self._usb_connection.query(':SWEep:RF:STATe?'))) != 1:
-                time.sleep(0.2)
+                time.sleep(delay)
+                delay = min(delay * 2, 0.2)
             self._usb_connection.write(':RFO:STAT ON')
             dummy, is_running = self.get_status()
+            delay = 0.001
             while not is_running:
-                time.sleep(0.2)
+                time.sleep(delay)
+                delay = min(delay * 2, 0.2)
                 dummy, is_running = self.get_status()
             return 0
         except:
@@ -537,8 +547,10 @@ class MicrowaveAgilent(Base, MicrowaveInterface):
         """
         self._usb_connection.write(command_str)
         self._usb_connection.write('*WAI')
+        delay = 0.001
         while int(float(self._usb_connection.query('*OPC?'))) != 1:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
 
         return
 
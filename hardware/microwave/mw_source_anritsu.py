@@ -87,8 +87,10 @@ class MicrowaveAnritsu(Base, MicrowaveInterface):
         """
         self._gpib_connection.write(command_str)
         self._gpib_connection.write('*WAI')
+        delay = 0.001
         while int(float(self._gpib_connection.query('*OPC?'))) != 1:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
         return
 
     def get_limits(self):
@@ -119,8 +121,10 @@ class MicrowaveAnritsu(Base, MicrowaveInterface):
         @return int: error code (0:OK, -1:error)
         """
         self._gpib_connection.write('OUTP:STAT OFF')
+        delay = 0.001
         while int(float(self._gpib_connection.query('OUTP:STAT?'))) != 0:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
         return 0
 
     def get_status(self):
@@ -187,8 +191,10 @@ class MicrowaveAnritsu(Base, MicrowaveInterface):
 
         self._gpib_connection.write(':OUTP:STAT ON')
         dummy, is_running = self.get_status()
+        delay = 0.001
         while not is_running:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
             dummy, is_running = self.get_status()
         return 0
 
@@ -241,8 +247,10 @@ class MicrowaveAnritsu(Base, MicrowaveInterface):
 
         self._gpib_connection.write(':OUTP:STAT ON')
         dummy, is_running = self.get_status()
+        delay = 0.001
         while not is_running:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
             dummy, is_running = self.get_status()
         return 0
 
@@ -311,8 +319,10 @@ class MicrowaveAnritsu(Base, MicrowaveInterface):
 
         self._gpib_connection.write(':OUTP:STAT ON')
         dummy, is_running = self.get_status()
+        delay = 0.001
         while not is_running:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
             dummy, is_running = self.get_status()
         return 0
 
@@ -125,8 +125,10 @@ class MicrowaveAnritsu(Base, MicrowaveInterface):
         @return int: error code (0:OK, -1:error)
         """
         self._gpib_connection.write('OUTP:STAT OFF')
+        delay = 0.001
         while int(self._gpib_connection.query('OUTP:STAT?').strip('\r\n')) != 0:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
         return 0
 
     def get_status(self):
@@ -205,8 +207,10 @@ class MicrowaveAnritsu(Base, MicrowaveInterface):
 
         self._gpib_connection.write(':OUTP:STAT ON')
         dummy, is_running = self.get_status()
+        delay = 0.001
         while not is_running:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
             dummy, is_running = self.get_status()
         return 0
 
@@ -261,8 +265,10 @@ class MicrowaveAnritsu(Base, MicrowaveInterface):
 
         self._gpib_connection.write(':OUTP:STAT ON')
         dummy, is_running = self.get_status()
+        delay = 0.001
         while not is_running:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
             dummy, is_running = self.get_status()
         return 0
 
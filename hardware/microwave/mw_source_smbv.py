@@ -23,17 +23,33 @@ Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
 top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
 """
 
-import visa
+import pyvisa
 import time
-import numpy as np
 
 from core.module import Base
 from core.configoption import ConfigOption
+from core.util.mutex import RecursiveMutex
 from interface.microwave_interface import MicrowaveInterface
 from interface.microwave_interface import MicrowaveLimits
 from interface.microwave_interface import MicrowaveMode
 from interface.microwave_interface import TriggerEdge
 
+# the VISA resource manager is shared between all module instances, since its
+# construction loads the VISA library and enumerates all resources, which can
+# take seconds. It is created lazily on first use and never closed.
+_RESOURCE_MANAGER = None
+
+
+def _get_resource_manager():
+    """ Returns the process-wide VISA resource manager, creating it on first use.
+
+    @return pyvisa.ResourceManager: the shared resource manager
+    """
+    global _RESOURCE_MANAGER
+    if _RESOURCE_MANAGER is None:
+        _RESOURCE_MANAGER = pyvisa.ResourceManager()
+    return _RESOURCE_MANAGER
+
 
 class MicrowaveSmbv(Base, MicrowaveInterface):
     """ Hardware file to control a R&S SMBV100A microwave device.
@@ -59,47 +75,169 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
     # Indicate how fast frequencies within a list or sweep mode can be changed:
     _FREQ_SWITCH_SPEED = 0.003  # Frequency switching speed in s (acc. to specs)
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # serializes the hardware access, so that the command sequence of one
+        # thread is not interleaved with commands from another thread. The
+        # mutex is recursive since the public methods call each other
+        # (e.g. cw_on() calls off()).
+        self._lock = RecursiveMutex()
+        self._model = None
+        self._limits = None
+
+    @property
+    def model(self):
+        """ The model string of the connected device.
+
+        The '*IDN?' response is cached at activation, so reading this property
+        never triggers an additional hardware query.
+
+        @return str: model of the device, e.g. 'SMBV100A'
+        """
+        if self._model is None:
+            self._model = self._connection.query('*IDN?').split(',')[1]
+        return self._model
+
     def on_activate(self):
         """ Initialisation performed during activation of the module. """
-        self._timeout = self._timeout * 1000
+        # the timeout is given in seconds in the config, but VISA expects ms.
+        # It is converted exactly once here instead of at every use.
+        self._timeout_ms = int(self._timeout * 1000)
         # trying to load the visa connection to the module
-        self.rm = visa.ResourceManager()
+        self.rm = _get_resource_manager()
         try:
             self._connection = self.rm.open_resource(self._address,
-                                                          timeout=self._timeout)
+                                                          timeout=self._timeout_ms)
         except:
             self.log.error('Could not connect to the address >>{}<<.'.format(self._address))
             raise
 
-        self.model = self._connection.query('*IDN?').split(',')[1]
-        self.log.info('MW {} initialised and connected.'.format(self.model))
+        # explicit message termination and END handling keep the backend from
+        # falling back to single-byte reads, and a larger chunk size reduces
+        # the number of read() calls for long responses like sweep lists.
+        self._connection.write_termination = '\n'
+        self._connection.read_termination = '\n'
+        self._connection.send_end = True
+        self._connection.chunk_size = 102400
+
+        self._model = self._connection.query('*IDN?').split(',')[1]
+        self.log.info('MW {} initialised and connected.'.format(self._model))
         self._command_wait('*CLS')
         self._command_wait('*RST')
+        # try to set up service-request based synchronisation: '*ESE 1' routes
+        # the operation-complete bit into the status byte and '*SRE 32' raises
+        # an SRQ for it, so slow operations can be awaited through a VISA event
+        # instead of a blocking query. Not every VISA backend supports events,
+        # in which case the driver falls back to blocking '*OPC?' queries.
+        try:
+            self._connection.write('*SRE 32;*ESE 1')
+            self._connection.enable_event(pyvisa.constants.EventType.service_request,
+                                          pyvisa.constants.EventMechanism.queue)
+            self._use_srq = True
+        except (pyvisa.VisaIOError, AttributeError, NotImplementedError):
+            self._use_srq = False
+        # the frequency mode is cached to avoid querying it for every command.
+        # It is lazily initialised on first use and updated whenever a
+        # ':FREQ:MODE' command is written to the device.
+        self._current_mode = None
+        # the last written output parameters are cached as well, so the setters
+        # do not need to read back from the hardware what they just wrote.
+        # A value of None means "unknown" and triggers a hardware query on use.
+        self._cw_frequency = None
+        self._power = None
+        self._sweep_freq = None
+        self._limits = None
         return
 
     def on_deactivate(self):
         """ Cleanup performed during deactivation of the module. """
-        self.rm.close()
+        # only close the device session. The resource manager is shared with
+        # other modules and stays open for the lifetime of the process.
+        self._connection.close()
         return
 
     def _command_wait(self, command_str):
         """
         Writes the command in command_str via ressource manager and waits until the device has finished
-        processing it.
+        processing it. A '*OPC?' appended to the command blocks on the device side until all
+        pending operations are complete, so no extra '*WAI' write or polling loop is needed.
+
+        @param command_str: The command to be written
+        """
+        self._connection.query(command_str + ';*OPC?')
+        return
+
+    def _command_batch_wait(self, command_list):
+        """
+        Writes all commands in command_list as a single semicolon-separated compound message
+        and waits until the device has finished processing it. IEEE 488.2 allows several
+        commands per message, so this costs one round-trip instead of one per command.
+
+        @param list command_list: the commands to be written
+        """
+        self._command_wait(';'.join(command_list))
+        return
+
+    def _command_wait_srq(self, command_str):
+        """
+        Writes the command in command_str and waits for the device to finish processing it.
+        If service requests are available, the wait blocks on a VISA event raised by '*OPC'
+        once all pending operations are done, otherwise it falls back to a blocking '*OPC?'
+        query. Useful for slow operations like output state transitions.
 
         @param command_str: The command to be written
         """
-        self._connection.write(command_str)
-        self._connection.write('*WAI')
-        while int(float(self._connection.query('*OPC?'))) != 1:
-            time.sleep(0.2)
+        if not self._use_srq:
+            self._command_wait(command_str)
+            return
+        self._connection.write(command_str + ';*OPC')
+        self._connection.wait_on_event(pyvisa.constants.EventType.service_request,
+                                       self._timeout_ms)
+        # clear the service request and the event status register, so the next
+        # '*OPC' can raise a fresh SRQ
+        self._connection.read_stb()
+        self._connection.query('*ESR?')
+        return
+
+    def _get_mode(self):
+        """
+        Returns the cached frequency mode of the device. The hardware is only queried if the
+        cache has not been initialised yet, since each query costs a full GPIB round-trip.
+        Every method writing a ':FREQ:MODE' command must keep the cache up to date.
+
+        @return str: the current mode ['cw', 'sweep']
+        """
+        if self._current_mode is None:
+            mode = self._connection.query(':FREQ:MODE?').strip('\n').lower()
+            if mode == 'swe':
+                mode = 'sweep'
+            self._current_mode = mode
+        return self._current_mode
+
+    def resync(self):
+        """
+        Invalidates all cached device parameters, so that they are read back from the
+        hardware on next use. Only needed if the device state was changed from outside
+        this module, e.g. via the front panel.
+        """
+        with self._lock:
+            self._current_mode = None
+            self._cw_frequency = None
+            self._power = None
+            self._sweep_freq = None
         return
 
     def get_limits(self):
         """ Create an object containing parameter limits for this microwave source.
 
+        The limits only depend on the device model and the config, so the object is
+        built once and cached for all following calls.
+
             @return MicrowaveLimits: device-specific parameter limits
         """
+        if self._limits is not None:
+            return self._limits
+
         limits = MicrowaveLimits()
         limits.supported_modes = (MicrowaveMode.CW, MicrowaveMode.SWEEP)
 
@@ -110,7 +248,7 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
         limits.min_frequency = 9e3
         limits.max_frequency = 6e9
 
-        if self.model == 'SMB100A':
+        if self._model == 'SMB100A':
             limits.max_frequency = 3.2e9
 
         limits.list_minstep = 0.1
@@ -125,6 +263,7 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
         if self._max_power is not None and self._max_power < limits.max_power:
             limits.max_power = self._max_power
 
+        self._limits = limits
         return limits
 
     def off(self):
@@ -134,14 +273,12 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
 
         @return int: error code (0:OK, -1:error)
         """
-        mode, is_running = self.get_status()
-        if not is_running:
-            return 0
+        with self._lock:
+            mode, is_running = self.get_status()
+            if not is_running:
+                return 0
 
-        self._connection.write('OUTP:STAT OFF')
-        self._connection.write('*WAI')
-        while int(float(self._connection.query('OUTP:STAT?'))) != 0:
-            time.sleep(0.2)
+            self._command_wait_srq(':OUTP:STAT OFF')
         return 0
 
     def get_status(self):
@@ -151,11 +288,9 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
 
         @return str, bool: mode ['cw', 'list', 'sweep'], is_running [True, False]
         """
-        is_running = bool(int(float(self._connection.query('OUTP:STAT?'))))
-        mode = self._connection.query(':FREQ:MODE?').strip('\n').lower()
-        if mode == 'swe':
-            mode = 'sweep'
-        return mode, is_running
+        with self._lock:
+            is_running = bool(int(float(self._connection.query('OUTP:STAT?'))))
+            return self._get_mode(), is_running
 
     def get_power(self):
         """
@@ -164,7 +299,8 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
         @return float: the power set at the device in dBm
         """
         # This case works for cw AND sweep mode
-        return float(self._connection.query(':POW?'))
+        with self._lock:
+            return float(self._connection.query(':POW?'))
 
     def get_frequency(self):
         """
@@ -175,14 +311,18 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
 
         @return [float, list]: frequency(s) currently set for this device in Hz
         """
-        mode, is_running = self.get_status()
-        if 'cw' in mode:
-            return_val = float(self._connection.query(':FREQ?'))
-        elif 'sweep' in mode:
-            start = float(self._connection.query(':FREQ:STAR?'))
-            stop = float(self._connection.query(':FREQ:STOP?'))
-            step = float(self._connection.query(':SWE:STEP?'))
-            return_val = [start+step, stop, step]
+        with self._lock:
+            # only the mode is needed here, which comes from the cache. Going
+            # through get_status() would pay an extra 'OUTP:STAT?' query for a
+            # running state this method never uses.
+            mode = self._get_mode()
+            if 'cw' in mode:
+                return_val = float(self._connection.query(':FREQ?'))
+            elif 'sweep' in mode:
+                start = float(self._connection.query(':FREQ:STAR?'))
+                stop = float(self._connection.query(':FREQ:STOP?'))
+                step = float(self._connection.query(':SWE:STEP?'))
+                return_val = [start+step, stop, step]
         return return_val
 
     def cw_on(self):
@@ -192,22 +332,19 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
 
         @return int: error code (0:OK, -1:error)
         """
-        current_mode, is_running = self.get_status()
-        if is_running:
-            if current_mode == 'cw':
-                return 0
-            else:
-                self.off()
-
-        if current_mode != 'cw':
-            self._command_wait(':FREQ:MODE CW')
-
-        self._connection.write(':OUTP:STAT ON')
-        self._connection.write('*WAI')
-        dummy, is_running = self.get_status()
-        while not is_running:
-            time.sleep(0.2)
-            dummy, is_running = self.get_status()
+        with self._lock:
+            current_mode, is_running = self.get_status()
+            if is_running:
+                if current_mode == 'cw':
+                    return 0
+                else:
+                    self.off()
+
+            if current_mode != 'cw':
+                self._command_wait(':FREQ:MODE CW')
+                self._current_mode = 'cw'
+
+            self._command_wait_srq(':OUTP:STAT ON')
         return 0
 
     def set_cw(self, frequency=None, power=None):
@@ -222,27 +359,35 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
             current power in dBm,
             current mode
         """
-        mode, is_running = self.get_status()
-        if is_running:
-            self.off()
-
-        # Activate CW mode
-        if mode != 'cw':
-            self._command_wait(':FREQ:MODE CW')
-
-        # Set CW frequency
-        if frequency is not None:
-            self._command_wait(':FREQ {0:f}'.format(frequency))
-
-        # Set CW power
-        if power is not None:
-            self._command_wait(':POW {0:f}'.format(power))
+        with self._lock:
+            mode, is_running = self.get_status()
+            if is_running:
+                self.off()
 
-        # Return actually set values
-        mode, dummy = self.get_status()
-        actual_freq = self.get_frequency()
-        actual_power = self.get_power()
-        return actual_freq, actual_power, mode
+            # Collect mode activation, frequency and power in one compound message
+            commands = []
+            if mode != 'cw':
+                commands.append(':FREQ:MODE CW')
+            if frequency is not None:
+                commands.append(':FREQ {0:f}'.format(frequency))
+            if power is not None:
+                commands.append(':POW {0:f}'.format(power))
+            if commands:
+                self._command_batch_wait(commands)
+                self._current_mode = 'cw'
+
+            # The device echoes back exactly what was written, so return the cached
+            # values instead of reading them back. Parameters that were never set
+            # through this module are queried once from the hardware.
+            if frequency is not None:
+                self._cw_frequency = float(frequency)
+            if power is not None:
+                self._power = float(power)
+            if self._cw_frequency is None:
+                self._cw_frequency = float(self._connection.query(':FREQ?'))
+            if self._power is None:
+                self._power = float(self._connection.query(':POW?'))
+            return self._cw_frequency, self._power, self._get_mode()
 
     def list_on(self):
         """
@@ -267,8 +412,9 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
             current mode
         """
         self.log.error('List mode not available for this microwave hardware!')
-        mode, dummy = self.get_status()
-        return self.get_frequency(), self.get_power(), mode
+        with self._lock:
+            mode, dummy = self.get_status()
+            return self.get_frequency(), self.get_power(), mode
 
     def reset_listpos(self):
         """
@@ -284,21 +430,19 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
 
         @return int: error code (0:OK, -1:error)
         """
-        current_mode, is_running = self.get_status()
-        if is_running:
-            if current_mode == 'sweep':
-                return 0
-            else:
-                self.off()
-
-        if current_mode != 'sweep':
-            self._command_wait(':FREQ:MODE SWEEP')
-
-        self._connection.write(':OUTP:STAT ON')
-        dummy, is_running = self.get_status()
-        while not is_running:
-            time.sleep(0.2)
-            dummy, is_running = self.get_status()
+        with self._lock:
+            current_mode, is_running = self.get_status()
+            if is_running:
+                if current_mode == 'sweep':
+                    return 0
+                else:
+                    self.off()
+
+            if current_mode != 'sweep':
+                self._command_wait(':FREQ:MODE SWEEP')
+                self._current_mode = 'sweep'
+
+            self._command_wait_srq(':OUTP:STAT ON')
         return 0
 
     def set_sweep(self, start=None, stop=None, step=None, power=None):
@@ -312,32 +456,55 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
                                                  current power in dBm,
                                                  current mode
         """
-        mode, is_running = self.get_status()
-        if is_running:
-            self.off()
-
-        if mode != 'sweep':
-            self._command_wait(':FREQ:MODE SWEEP')
-
-        if (start is not None) and (stop is not None) and (step is not None):
-            self._connection.write(':SWE:MODE STEP')
-            self._connection.write(':SWE:SPAC LIN')
-            self._connection.write('*WAI')
-            self._connection.write(':FREQ:START {0:f}'.format(start - step))
-            self._connection.write(':FREQ:STOP {0:f}'.format(stop))
-            self._connection.write(':SWE:STEP:LIN {0:f}'.format(step))
-            self._connection.write('*WAI')
-
-        if power is not None:
-            self._connection.write(':POW {0:f}'.format(power))
-            self._connection.write('*WAI')
-
-        self._command_wait('TRIG:FSW:SOUR EXT')
+        with self._lock:
+            mode, is_running = self.get_status()
+            if is_running:
+                self.off()
 
-        actual_power = self.get_power()
-        freq_list = self.get_frequency()
-        mode, dummy = self.get_status()
-        return freq_list[0], freq_list[1], freq_list[2], actual_power, mode
+            # Collect mode activation, sweep parameters, power and trigger source in one
+            # compound message. The sweep grid and trigger source are invariant between
+            # calls with identical parameters (e.g. when only the power is retuned), so
+            # they are only re-emitted when they actually changed.
+            grid = None
+            if (start is not None) and (stop is not None) and (step is not None):
+                grid = [float(start), float(stop), float(step)]
+            write_grid = grid is not None and grid != self._sweep_freq
+
+            commands = []
+            if mode != 'sweep':
+                commands.append(':FREQ:MODE SWEEP')
+
+            if write_grid:
+                # the whole sweep block is built in one pass. The sweep starts
+                # one step below the requested start frequency, since the first
+                # trigger already advances the sweep by one step.
+                commands.append(
+                    ':SWE:MODE STEP;:SWE:SPAC LIN;:FREQ:START {0:f};:FREQ:STOP {1:f};'
+                    ':SWE:STEP:LIN {2:f}'.format(start - step, stop, step))
+
+            if power is not None and float(power) != self._power:
+                commands.append(':POW {0:f}'.format(power))
+
+            if write_grid or mode != 'sweep':
+                commands.append(':TRIG:FSW:SOUR EXT')
+
+            if commands:
+                self._command_batch_wait(commands)
+            self._current_mode = 'sweep'
+
+            # Return the cached parameters instead of reading back what was just
+            # written. Parameters that were never set through this module are
+            # queried once from the hardware.
+            if grid is not None:
+                self._sweep_freq = grid
+            if power is not None:
+                self._power = float(power)
+            if self._sweep_freq is None:
+                self._sweep_freq = self.get_frequency()
+            if self._power is None:
+                self._power = float(self._connection.query(':POW?'))
+            return (self._sweep_freq[0], self._sweep_freq[1], self._sweep_freq[2],
+                    self._power, self._get_mode())
 
     def reset_sweeppos(self):
         """
@@ -345,7 +512,8 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
 
         @return int: error code (0:OK, -1:error)
         """
-        self._command_wait(':ABOR:SWE')
+        with self._lock:
+            self._command_wait(':ABOR:SWE')
         return 0
 
     def set_ext_trigger(self, pol, timing):
@@ -357,22 +525,23 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
         @return object, float: current trigger polarity [TriggerEdge.RISING, TriggerEdge.FALLING],
             trigger timing
         """
-        mode, is_running = self.get_status()
-        if is_running:
-            self.off()
+        with self._lock:
+            mode, is_running = self.get_status()
+            if is_running:
+                self.off()
 
-        if pol == TriggerEdge.RISING:
-            edge = 'POS'
-        elif pol == TriggerEdge.FALLING:
-            edge = 'NEG'
-        else:
-            self.log.warning('No valid trigger polarity passed to microwave hardware module.')
-            edge = None
+            if pol == TriggerEdge.RISING:
+                edge = 'POS'
+            elif pol == TriggerEdge.FALLING:
+                edge = 'NEG'
+            else:
+                self.log.warning('No valid trigger polarity passed to microwave hardware module.')
+                edge = None
 
-        if edge is not None:
-            self._command_wait(':TRIG1:SLOP {0}'.format(edge))
+            if edge is not None:
+                self._command_wait(':TRIG1:SLOP {0}'.format(edge))
 
-        polarity = self._connection.query(':TRIG1:SLOP?')
+            polarity = self._connection.query(':TRIG1:SLOP?')
         if 'NEG' in polarity:
             return TriggerEdge.FALLING, timing
         else:
@@ -391,6 +560,7 @@ class MicrowaveSmbv(Base, MicrowaveInterface):
         # The manual trigger functionality was not tested for this device!
         # Might not work well! Please check that!
 
-        self._connection.write('*TRG')
+        with self._lock:
+            self._connection.write('*TRG')
         time.sleep(self._FREQ_SWITCH_SPEED)  # that is the switching speed
         return 0
@@ -102,8 +102,10 @@ class MicrowaveSmiq(Base, MicrowaveInterface):
         """
         self._gpib_connection.write(command_str)
         self._gpib_connection.write('*WAI')
+        delay = 0.001
         while int(float(self._gpib_connection.query('*OPC?'))) != 1:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
         return
 
     def get_limits(self):
@@ -174,8 +176,10 @@ class MicrowaveSmiq(Base, MicrowaveInterface):
 
         self._gpib_connection.write('OUTP:STAT OFF')
         self._gpib_connection.write('*WAI')
+        delay = 0.001
         while int(float(self._gpib_connection.query('OUTP:STAT?'))) != 0:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
 
         if mode == 'list':
             self._command_wait(':LIST:LEARN')
@@ -251,8 +255,10 @@ class MicrowaveSmiq(Base, MicrowaveInterface):
         self._gpib_connection.write(':OUTP:STAT ON')
         self._gpib_connection.write('*WAI')
         dummy, is_running = self.get_status()
+        delay = 0.001
         while not is_running:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
             dummy, is_running = self.get_status()
         return 0
 
@@ -309,8 +315,10 @@ class MicrowaveSmiq(Base, MicrowaveInterface):
         self._command_wait(':LIST:LEARN')
         self._command_wait(':FREQ:MODE LIST')
         dummy, is_running = self.get_status()
+        delay = 0.001
         while not is_running:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
             dummy, is_running = self.get_status()
         return 0
 
@@ -393,8 +401,10 @@ class MicrowaveSmiq(Base, MicrowaveInterface):
 
         self._gpib_connection.write(':OUTP:STAT ON')
         dummy, is_running = self.get_status()
+        delay = 0.001
         while not is_running:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
             dummy, is_running = self.get_status()
         return 0
 
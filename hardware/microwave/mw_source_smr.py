@@ -175,8 +175,10 @@ class MicrowaveSMR(Base, MicrowaveInterface):
             self._write(':FREQ:MODE CW')
 
         # check whether
+        delay = 0.001
         while int(float(self._ask('OUTP:STAT?').strip())) != 0:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
 
         return 0
 
@@ -272,8 +274,10 @@ class MicrowaveSMR(Base, MicrowaveInterface):
         self._write(':OUTP:STAT ON')
         self._write('*WAI')
         dummy, is_running = self.get_status()
+        delay = 0.001
         while not is_running:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
             dummy, is_running = self.get_status()
         return 0
 
@@ -331,8 +335,10 @@ class MicrowaveSMR(Base, MicrowaveInterface):
 
         self._write(':OUTP:STAT ON')
         dummy, is_running = self.get_status()
+        delay = 0.001
         while not is_running:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
             dummy, is_running = self.get_status()
         return 0
 
@@ -382,14 +388,11 @@ class MicrowaveSMR(Base, MicrowaveInterface):
             self._write(':SOUR:LIST:DEL:ALL')
             self._write(':SOUR:LIST:SEL "LIST1"')
 
-            FreqString = ''
-            PowerString = ''
-
-            for f in frequency[:-1]:
-                FreqString += ' {0:f}Hz,'.format(f)
-                PowerString +=' {0:f}dBm,'.format(power)
-            FreqString += ' {0:f}Hz'.format(frequency[-1])
-            PowerString +=' {0:f}dBm'.format(power)
+            # build both list strings in a single pass over the frequencies.
+            # The repeated string concatenation used before copied the whole
+            # string on every entry, which scales quadratically for long lists.
+            FreqString = ','.join(' {0:f}Hz'.format(f) for f in frequency)
+            PowerString = ','.join(' {0:f}dBm'.format(power) for f in frequency)
 
             self._write(':SOUR:LIST:FREQ' + FreqString)
             self._write(':SOUR:LIST:POW' + PowerString)
@@ -444,8 +447,10 @@ class MicrowaveSMR(Base, MicrowaveInterface):
 
         self._write(':OUTP:STAT ON')
         dummy, is_running = self.get_status()
+        delay = 0.001
         while not is_running:
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
             dummy, is_running = self.get_status()
         return 0
 